@@ -0,0 +1,58 @@
+"""
+Cache Helpers
+
+Optional Redis read-through cache in front of MongoDB for hot product
+reads. Every helper degrades to a no-op when REDIS_URL is not set, so
+the app keeps working without Redis and cache errors never fail a
+request.
+"""
+
+import os
+from typing import Optional
+
+import orjson
+import redis.asyncio as redis
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+cache = None
+
+redis_url = os.getenv("REDIS_URL")
+
+if redis_url:
+    cache = redis.from_url(redis_url, decode_responses=True)
+
+
+async def cache_get(key: str) -> Optional[dict]:
+    """Fetch and decode a cached JSON value, or None on miss/error"""
+    if cache is None:
+        return None
+    try:
+        raw = await cache.get(key)
+    except Exception:
+        return None
+    return orjson.loads(raw) if raw else None
+
+
+async def cache_set(key: str, value, ttl_seconds: int):
+    """Store a JSON-serializable value with a TTL"""
+    if cache is None:
+        return
+    try:
+        # orjson so datetimes serialize as ISO-8601, byte-compatible with
+        # what the uncached response paths emit
+        await cache.setex(key, ttl_seconds, orjson.dumps(value, default=str))
+    except Exception:
+        pass
+
+
+async def cache_delete(*keys: str):
+    """Invalidate one or more cache keys"""
+    if cache is None or not keys:
+        return
+    try:
+        await cache.delete(*keys)
+    except Exception:
+        pass
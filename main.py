@@ -1,16 +1,36 @@
 import os
 from datetime import datetime, timezone, timedelta
+from functools import lru_cache
 from typing import List, Optional
 
-from fastapi import FastAPI, HTTPException, Query
+import jinja2
+import orjson
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import HTMLResponse, ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
 
+from cache import cache_get, cache_set, cache_delete
 from database import db
 from schemas import Product as ProductSchema, Customer, Order as OrderSchema, OrderItem as OrderItemSchema, Invoice as InvoiceSchema
 
-app = FastAPI(title="Jewellery Management API")
+def orjson_default(obj):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError
+
+
+class MongoORJSONResponse(ORJSONResponse):
+    # ORJSONResponse with an ObjectId fallback so Mongo documents can be
+    # encoded directly, without mutating them first.
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=orjson_default)
+
+
+app = FastAPI(title="Jewellery Management API", default_response_class=MongoORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -22,6 +42,13 @@ app.add_middleware(
 
 
 # Helpers
+@lru_cache(maxsize=4096)
+def _cached_object_id(value: str) -> ObjectId:
+    # ObjectId is immutable, so hot ids (repeated product lookups, cart
+    # re-submits) reuse one instance instead of re-parsing the hex string.
+    return ObjectId(value)
+
+
 class PyObjectId(ObjectId):
     @classmethod
     def __get_validators__(cls):
@@ -33,7 +60,7 @@ class PyObjectId(ObjectId):
             return v
         if not ObjectId.is_valid(v):
             raise ValueError("Invalid ObjectId")
-        return ObjectId(v)
+        return _cached_object_id(v)
 
 def to_str_id(doc):
     if not doc:
@@ -43,6 +70,28 @@ def to_str_id(doc):
     return doc
 
 
+def stream_json_array(cursor, cache_key: Optional[str] = None, cache_ttl: int = 0):
+    # Stream a Mongo cursor out as a JSON array without materializing the
+    # whole result set in memory; first byte goes out with the first doc.
+    # With cache_key set, the full result is written through to the cache
+    # once the stream completes.
+    async def gen():
+        docs = [] if cache_key else None
+        first = True
+        yield b"["
+        async for doc in cursor:
+            doc = to_str_id(doc)
+            if docs is not None:
+                docs.append(doc)
+            yield (b"" if first else b",") + orjson.dumps(doc, default=orjson_default)
+            first = False
+        yield b"]"
+        if docs is not None:
+            await cache_set(cache_key, docs, cache_ttl)
+
+    return StreamingResponse(gen(), media_type="application/json")
+
+
 def calc_item_totals(unit_price: float, making_charges: float, qty: int, tax_rate: float):
     subtotal = (unit_price + making_charges) * qty
     tax_amount = round(subtotal * (tax_rate / 100.0), 2)
@@ -50,14 +99,41 @@ def calc_item_totals(unit_price: float, making_charges: float, qty: int, tax_rat
     return round(subtotal, 2), tax_amount, total
 
 
+def calc_items_totals(unit_prices, making_charges, qtys, tax_rates):
+    # Batched calc_item_totals: computes every line in one pass over
+    # parallel sequences instead of a Python call per item. Rounding
+    # matches the scalar helper exactly.
+    subtotals = [(u + m) * q for u, m, q in zip(unit_prices, making_charges, qtys)]
+    taxes = [round(s * (t / 100.0), 2) for s, t in zip(subtotals, tax_rates)]
+    totals = [round(s + x, 2) for s, x in zip(subtotals, taxes)]
+    return [round(s, 2) for s in subtotals], taxes, totals
+
+
+@app.on_event("startup")
+async def ensure_indexes():
+    # Back the list/search endpoints with indexes so they are index seeks
+    # instead of collection scans with in-memory sorts.
+    if db is None:
+        return
+    await db["product"].create_index([("sku", 1)], unique=True)
+    await db["product"].create_index(
+        [("sku", 1)], name="sku_ci", collation={"locale": "en", "strength": 2}
+    )
+    await db["product"].create_index([("name", 1)])
+    await db["product"].create_index([("name", "text"), ("sku", "text")])
+    await db["order"].create_index([("created_at", -1)])
+    await db["order"].create_index([("order_number", 1)], unique=True)
+    await db["invoice"].create_index([("issue_date", -1)])
+
+
 # Health and test
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "Jewellery Management Backend Running"}
 
 
 @app.get("/test")
-def test_database():
+async def test_database():
     response = {
         "backend": "✅ Running",
         "database": "❌ Not Available",
@@ -71,7 +147,7 @@ def test_database():
             response["database"] = "✅ Connected"
             response["connection_status"] = "Connected"
             try:
-                response["collections"] = db.list_collection_names()
+                response["collections"] = await db.list_collection_names()
             except Exception:
                 pass
     except Exception as e:
@@ -80,61 +156,94 @@ def test_database():
 
 
 # Product Endpoints
+PRODUCT_CACHE_TTL = 300
+PRODUCT_LIST_CACHE_TTL = 60
+
+
 @app.get("/api/products")
-def list_products(q: Optional[str] = Query(default=None, description="Search by SKU or name")):
-    query = {}
+async def list_products(q: Optional[str] = Query(default=None, description="Search by SKU or name")):
     if q:
-        query = {"$or": [
-            {"sku": {"$regex": q, "$options": "i"}},
-            {"name": {"$regex": q, "$options": "i"}},
-        ]}
-    products = list(db["product"].find(query).sort("name", 1))
-    return [to_str_id(p) for p in products]
+        # Case-insensitive exact SKU lookup first, via the collated index;
+        # otherwise full-text search on the name+sku text index, ranked by
+        # relevance. Both are index seeks, unlike the case-insensitive
+        # $regex this replaces, which always collection-scanned.
+        sku_matches = await (
+            db["product"].find({"sku": q})
+            .collation({"locale": "en", "strength": 2})
+            .to_list(length=None)
+        )
+        if sku_matches:
+            return [to_str_id(p) for p in sku_matches]
+        # Sort on $meta without projecting it, so response documents keep
+        # the same shape as the SKU and unfiltered branches
+        cursor = (
+            db["product"]
+            .find({"$text": {"$search": q}})
+            .sort([("score", {"$meta": "textScore"})])
+        )
+        return stream_json_array(cursor)
+    if (cached := await cache_get("products:all")) is not None:
+        return cached
+    cursor = db["product"].find({}).sort("name", 1)
+    return stream_json_array(
+        cursor,
+        cache_key="products:all",
+        cache_ttl=PRODUCT_LIST_CACHE_TTL,
+    )
 
 
 @app.post("/api/products")
-def create_product(product: ProductSchema):
-    # Ensure SKU uniqueness
-    existing = db["product"].find_one({"sku": product.sku})
-    if existing:
-        raise HTTPException(status_code=400, detail="SKU already exists")
+async def create_product(product: ProductSchema):
     data = product.model_dump()
     now = datetime.now(timezone.utc)
     data.update({"created_at": now, "updated_at": now})
-    result = db["product"].insert_one(data)
-    created = db["product"].find_one({"_id": result.inserted_id})
-    return to_str_id(created)
+    # SKU uniqueness is enforced by the unique index; no pre-check query
+    try:
+        result = await db["product"].insert_one(data)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="SKU already exists")
+    # insert_one set _id on data, so it matches what a re-fetch would return
+    await cache_delete("products:all")
+    return to_str_id(data)
 
 
 @app.get("/api/products/{product_id}")
-def get_product(product_id: str):
-    doc = db["product"].find_one({"_id": PyObjectId.validate(product_id)})
+async def get_product(product_id: str):
+    if (cached := await cache_get(f"product:{product_id}")) is not None:
+        return cached
+    doc = await db["product"].find_one({"_id": PyObjectId.validate(product_id)})
     if not doc:
         raise HTTPException(status_code=404, detail="Product not found")
-    return to_str_id(doc)
+    doc = to_str_id(doc)
+    await cache_set(f"product:{product_id}", doc, PRODUCT_CACHE_TTL)
+    return doc
 
 
 @app.put("/api/products/{product_id}")
-def update_product(product_id: str, product: ProductSchema):
+async def update_product(product_id: str, product: ProductSchema):
     oid = PyObjectId.validate(product_id)
-    # If SKU changed, enforce uniqueness
-    existing_by_sku = db["product"].find_one({"sku": product.sku, "_id": {"$ne": oid}})
-    if existing_by_sku:
-        raise HTTPException(status_code=400, detail="SKU already in use")
     data = product.model_dump()
     data["updated_at"] = datetime.now(timezone.utc)
-    res = db["product"].update_one({"_id": oid}, {"$set": data})
-    if res.matched_count == 0:
+    # If SKU changed, the unique index rejects a clash atomically; AFTER
+    # returns the updated doc in the same round-trip as the write
+    try:
+        doc = await db["product"].find_one_and_update(
+            {"_id": oid}, {"$set": data}, return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="SKU already in use")
+    if doc is None:
         raise HTTPException(status_code=404, detail="Product not found")
-    doc = db["product"].find_one({"_id": oid})
+    await cache_delete(f"product:{product_id}", "products:all")
     return to_str_id(doc)
 
 
 @app.delete("/api/products/{product_id}")
-def delete_product(product_id: str):
-    res = db["product"].delete_one({"_id": PyObjectId.validate(product_id)})
+async def delete_product(product_id: str):
+    res = await db["product"].delete_one({"_id": PyObjectId.validate(product_id)})
     if res.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Product not found")
+    await cache_delete(f"product:{product_id}", "products:all")
     return {"success": True}
 
 
@@ -149,85 +258,126 @@ class CreateOrderRequest(BaseModel):
     notes: Optional[str] = None
 
 
-def generate_order_number():
-    count = db["order"].count_documents({}) + 1
-    return f"ORD-{count:05d}"
+async def next_sequence(name: str) -> int:
+    # Atomic counter per the standard Mongo "sequence" pattern: a single
+    # indexed update instead of a full-collection count, and safe under
+    # concurrent creates.
+    doc = await db["counters"].find_one_and_update(
+        {"_id": name},
+        {"$inc": {"seq": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return doc["seq"]
+
+
+async def generate_order_number():
+    seq = await next_sequence("order")
+    return f"ORD-{seq:05d}"
 
 
 @app.post("/api/orders")
-def create_order(payload: CreateOrderRequest):
+async def create_order(payload: CreateOrderRequest):
     if not payload.items:
         raise HTTPException(status_code=400, detail="No items in order")
 
-    # Fetch products and compute totals; also validate stock
-    order_items: List[OrderItemSchema] = []
-    subtotal_total = 0.0
-    tax_total = 0.0
-
-    for item in payload.items:
-        prod = db["product"].find_one({"_id": PyObjectId.validate(item.product_id)})
-        if not prod:
-            raise HTTPException(status_code=400, detail=f"Product not found: {item.product_id}")
-        if prod.get("stock_qty", 0) < item.qty:
-            raise HTTPException(status_code=400, detail=f"Insufficient stock for {prod.get('name')}")
-
-        unit_price = float(prod.get("unit_price", 0))
-        making = float(prod.get("making_charges", 0))
-        tax_rate = float(prod.get("tax_rate", 0))
-        subtotal, tax_amount, total = calc_item_totals(unit_price, making, item.qty, tax_rate)
-        subtotal_total += subtotal
-        tax_total += tax_amount
-
-        order_item = OrderItemSchema(
-            product_id=str(prod["_id"]),
-            sku=prod.get("sku"),
-            name=prod.get("name"),
-            qty=item.qty,
-            unit_price=unit_price,
-            making_charges=making,
-            tax_rate=tax_rate,
-            subtotal=subtotal,
-            tax_amount=tax_amount,
-            total=total,
-        )
-        order_items.append(order_item)
-
-    grand_total = round(subtotal_total + tax_total, 2)
-
-    order_number = generate_order_number()
-    now = datetime.now(timezone.utc)
-    order_doc = OrderSchema(
-        order_number=order_number,
-        customer=payload.customer,
-        items=order_items,
-        notes=payload.notes,
-        status="created",
-        subtotal=round(subtotal_total, 2),
-        tax_total=round(tax_total, 2),
-        grand_total=grand_total,
-        created_at=now,
-        updated_at=now,
-    ).model_dump()
-
-    result = db["order"].insert_one(order_doc)
+    oids = [PyObjectId.validate(item.product_id) for item in payload.items]
+
+    async def _create(session):
+        # Fetch all products in one query and validate stock
+        prods = {p["_id"]: p async for p in db["product"].find({"_id": {"$in": oids}}, session=session)}
+
+        resolved = []
+        for item, oid in zip(payload.items, oids):
+            prod = prods.get(oid)
+            if not prod:
+                raise HTTPException(status_code=400, detail=f"Product not found: {item.product_id}")
+            if prod.get("stock_qty", 0) < item.qty:
+                raise HTTPException(status_code=400, detail=f"Insufficient stock for {prod.get('name')}")
+            resolved.append(prod)
+
+        # Compute all line totals in one batched pass
+        unit_prices = [float(p.get("unit_price", 0)) for p in resolved]
+        makings = [float(p.get("making_charges", 0)) for p in resolved]
+        qtys = [item.qty for item in payload.items]
+        tax_rates = [float(p.get("tax_rate", 0)) for p in resolved]
+        subtotals, taxes, totals = calc_items_totals(unit_prices, makings, qtys, tax_rates)
+        subtotal_total = sum(subtotals)
+        tax_total = sum(taxes)
+
+        order_items: List[OrderItemSchema] = [
+            OrderItemSchema.model_construct(
+                product_id=str(prod["_id"]),
+                sku=prod.get("sku"),
+                name=prod.get("name"),
+                qty=item.qty,
+                unit_price=unit_price,
+                making_charges=making,
+                tax_rate=tax_rate,
+                subtotal=subtotal,
+                tax_amount=tax_amount,
+                total=total,
+            )
+            for prod, item, unit_price, making, tax_rate, subtotal, tax_amount, total in zip(
+                resolved, payload.items, unit_prices, makings, tax_rates, subtotals, taxes, totals
+            )
+        ]
+
+        grand_total = round(subtotal_total + tax_total, 2)
+
+        # Counter lives outside the transaction; an abort just leaves a gap
+        # in the sequence.
+        order_number = await generate_order_number()
+        now = datetime.now(timezone.utc)
+        order_doc = OrderSchema.model_construct(
+            order_number=order_number,
+            customer=payload.customer,
+            items=order_items,
+            notes=payload.notes,
+            status="created",
+            subtotal=round(subtotal_total, 2),
+            tax_total=round(tax_total, 2),
+            grand_total=grand_total,
+            created_at=now,
+            updated_at=now,
+        ).model_dump()
+
+        await db["order"].insert_one(order_doc, session=session)
+
+        # Reduce stock in one batched round-trip. The stock_qty guard makes
+        # each decrement atomic; any miss aborts the transaction, rolling
+        # back the insert and every decrement together.
+        ops = [
+            UpdateOne(
+                {"_id": oid, "stock_qty": {"$gte": item.qty}},
+                {"$inc": {"stock_qty": -item.qty}},
+            )
+            for item, oid in zip(payload.items, oids)
+        ]
+        bulk = await db["product"].bulk_write(ops, ordered=False, session=session)
+        if bulk.matched_count != len(ops):
+            raise HTTPException(status_code=409, detail="Insufficient stock")
+        # insert_one set _id on order_doc; no re-fetch needed
+        return order_doc
+
+    # One atomic unit: the product reads, the order insert and the stock
+    # decrements commit or abort together.
+    async with await db.client.start_session() as session:
+        created = await session.with_transaction(_create)
 
-    # Reduce stock
-    for item in payload.items:
-        db["product"].update_one({"_id": PyObjectId.validate(item.product_id)}, {"$inc": {"stock_qty": -item.qty}})
-
-    created = db["order"].find_one({"_id": result.inserted_id})
     return to_str_id(created)
 
 
 @app.get("/api/orders")
-def list_orders():
-    orders = list(db["order"].find().sort("created_at", -1))
-    return [to_str_id(o) for o in orders]
+async def list_orders():
+    # Project out per-line items: the list view only shows order headers,
+    # and the detail endpoint returns the full document.
+    return stream_json_array(db["order"].find({}, {"items": 0}).sort("created_at", -1))
 
 
 @app.get("/api/orders/{order_id}")
-def get_order(order_id: str):
-    doc = db["order"].find_one({"_id": PyObjectId.validate(order_id)})
+async def get_order(order_id: str):
+    doc = await db["order"].find_one({"_id": PyObjectId.validate(order_id)})
     if not doc:
         raise HTTPException(status_code=404, detail="Order not found")
     return to_str_id(doc)
@@ -240,73 +390,106 @@ class InvoiceCreateRequest(BaseModel):
     notes: Optional[str] = None
 
 
-def generate_invoice_number():
-    count = db["invoice"].count_documents({}) + 1
-    return f"INV-{count:05d}"
+async def generate_invoice_number():
+    seq = await next_sequence("invoice")
+    return f"INV-{seq:05d}"
 
 
-def render_invoice_html(invoice: dict) -> str:
-    # Very basic printable HTML for invoice
-    items_html = "".join([
-        f"<tr><td>{i.get('sku')}</td><td>{i.get('name')}</td><td style='text-align:right'>{i.get('qty')}</td><td style='text-align:right'>{i.get('unit_price'):.2f}</td><td style='text-align:right'>{i.get('making_charges'):.2f}</td><td style='text-align:right'>{i.get('subtotal'):.2f}</td><td style='text-align:right'>{i.get('tax_amount'):.2f}</td><td style='text-align:right'>{i.get('total'):.2f}</td></tr>"
-        for i in invoice.get("items", [])
-    ])
-    html = f"""
+# Very basic printable HTML for invoice; parsed and compiled once at
+# import, so each render is just the compiled template writing strings.
+INVOICE_TEMPLATE = """
     <html>
     <head>
       <meta charset='utf-8' />
-      <title>Invoice {invoice.get('invoice_number')}</title>
+      <title>Invoice {{ invoice.invoice_number }}</title>
       <style>
-        body {{ font-family: Arial, sans-serif; color:#111; }}
-        .container {{ max-width: 900px; margin: 0 auto; }}
-        table {{ width:100%; border-collapse: collapse; }}
-        th, td {{ border:1px solid #ddd; padding:8px; }}
-        th {{ background:#f5f5f5; text-align:left; }}
-        .right {{ text-align:right; }}
+        body { font-family: Arial, sans-serif; color:#111; }
+        .container { max-width: 900px; margin: 0 auto; }
+        table { width:100%; border-collapse: collapse; }
+        th, td { border:1px solid #ddd; padding:8px; }
+        th { background:#f5f5f5; text-align:left; }
+        .right { text-align:right; }
       </style>
     </head>
     <body>
       <div class='container'>
-        <h1>Invoice {invoice.get('invoice_number')}</h1>
-        <p><strong>Order:</strong> {invoice.get('order_number')}</p>
-        <p><strong>Issue Date:</strong> {invoice.get('issue_date')}</p>
+        <h1>Invoice {{ invoice.invoice_number }}</h1>
+        <p><strong>Order:</strong> {{ invoice.order_number }}</p>
+        <p><strong>Issue Date:</strong> {{ invoice.issue_date }}</p>
         <h3>Bill To</h3>
-        <p>{invoice['billed_to'].get('name')}<br/>{invoice['billed_to'].get('email','')}<br/>{invoice['billed_to'].get('phone','')}<br/>{invoice['billed_to'].get('address','')}</p>
+        <p>{{ invoice.billed_to.name }}<br/>{{ invoice.billed_to.email or '' }}<br/>{{ invoice.billed_to.phone or '' }}<br/>{{ invoice.billed_to.address or '' }}</p>
         <h3>Items</h3>
         <table>
           <thead>
             <tr><th>SKU</th><th>Name</th><th class='right'>Qty</th><th class='right'>Unit</th><th class='right'>Making</th><th class='right'>Sub</th><th class='right'>Tax</th><th class='right'>Total</th></tr>
           </thead>
           <tbody>
-            {items_html}
+            {% for i in invoice['items'] -%}
+            <tr><td>{{ i.sku }}</td><td>{{ i.name }}</td><td style='text-align:right'>{{ i.qty }}</td><td style='text-align:right'>{{ i.unit_price|money }}</td><td style='text-align:right'>{{ i.making_charges|money }}</td><td style='text-align:right'>{{ i.subtotal|money }}</td><td style='text-align:right'>{{ i.tax_amount|money }}</td><td style='text-align:right'>{{ i.total|money }}</td></tr>
+            {% endfor -%}
           </tbody>
         </table>
-        <h3 class='right'>Subtotal: {invoice.get('subtotal'):.2f}</h3>
-        <h3 class='right'>Tax: {invoice.get('tax_total'):.2f}</h3>
-        <h2 class='right'>Grand Total: {invoice.get('grand_total'):.2f}</h2>
-        <p>{invoice.get('notes','')}</p>
+        <h3 class='right'>Subtotal: {{ invoice.subtotal|money }}</h3>
+        <h3 class='right'>Tax: {{ invoice.tax_total|money }}</h3>
+        <h2 class='right'>Grand Total: {{ invoice.grand_total|money }}</h2>
+        <p>{{ invoice.notes or '' }}</p>
       </div>
     </body>
     </html>
     """
-    return html
+
+def _money(value) -> str:
+    # Two-decimal currency formatting via integer math; skips the
+    # general-purpose format machinery in the per-row hot loop. The inner
+    # round(value, 2) keeps >2dp inputs (e.g. unit prices straight off the
+    # product doc) rounding exactly as {:.2f} did; scaling first would
+    # round 2.675 up where the float formatter rounds it down.
+    cents = round(round(value, 2) * 100)
+    sign = "-" if cents < 0 else ""
+    whole, frac = divmod(abs(cents), 100)
+    return sign + str(whole) + "." + str(100 + frac)[1:]
+
+
+_jinja_env = jinja2.Environment(autoescape=True, cache_size=-1)
+_jinja_env.filters["money"] = _money
+_invoice_template = _jinja_env.from_string(INVOICE_TEMPLATE)
+
+
+def render_invoice_html(invoice: dict) -> str:
+    return _invoice_template.render(invoice=invoice)
+
+
+INVOICE_HTML_CACHE_TTL = 300
+
+
+async def render_and_store_html(invoice_id):
+    # Background task: render the printable HTML after the create response
+    # has gone out and persist it on the invoice document.
+    doc = await db["invoice"].find_one({"_id": invoice_id})
+    if not doc:
+        return
+    html = render_invoice_html(doc)
+    await db["invoice"].update_one({"_id": invoice_id}, {"$set": {"html": html}})
+    await cache_set(f"invoice:html:{invoice_id}", html, INVOICE_HTML_CACHE_TTL)
 
 
 @app.post("/api/orders/{order_id}/invoice")
-def create_invoice(order_id: str, payload: InvoiceCreateRequest):
-    order = db["order"].find_one({"_id": PyObjectId.validate(order_id)})
+async def create_invoice(order_id: str, payload: InvoiceCreateRequest, background_tasks: BackgroundTasks):
+    order = await db["order"].find_one({"_id": PyObjectId.validate(order_id)})
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
 
-    invoice_number = generate_invoice_number()
+    invoice_number = await generate_invoice_number()
     issue_date = payload.issue_date or datetime.now(timezone.utc)
 
-    invoice_doc = InvoiceSchema(
+    # Wrap the raw Mongo dicts in real model instances so model_dump
+    # serializes them through the declared schemas, not the fallback path
+    invoice_doc = InvoiceSchema.model_construct(
         invoice_number=invoice_number,
         order_id=str(order["_id"]),
         order_number=order["order_number"],
-        billed_to=order["customer"],
-        items=order["items"],
+        billed_to=Customer.model_construct(**order["customer"]),
+        items=[OrderItemSchema.model_construct(**i) for i in order["items"]],
         subtotal=float(order["subtotal"]),
         tax_total=float(order["tax_total"]),
         grand_total=float(order["grand_total"]),
@@ -315,29 +498,50 @@ def create_invoice(order_id: str, payload: InvoiceCreateRequest):
         notes=payload.notes,
     ).model_dump()
 
-    # Render HTML and attach
-    invoice_doc["html"] = render_invoice_html(invoice_doc)
-
-    res = db["invoice"].insert_one(invoice_doc)
-    created = db["invoice"].find_one({"_id": res.inserted_id})
-    return to_str_id(created)
+    res = await db["invoice"].insert_one(invoice_doc)
+    # Render the printable HTML off the request path
+    background_tasks.add_task(render_and_store_html, res.inserted_id)
+    # insert_one set _id on invoice_doc; no re-fetch needed
+    return to_str_id(invoice_doc)
 
 
 @app.get("/api/invoices")
-def list_invoices():
-    invs = list(db["invoice"].find().sort("issue_date", -1))
-    return [to_str_id(i) for i in invs]
+async def list_invoices():
+    # Exclude the rendered HTML blob (often many KB per invoice); clients
+    # fetch it from the detail endpoint when printing.
+    return stream_json_array(db["invoice"].find({}, {"html": 0}).sort("issue_date", -1))
 
 
 @app.get("/api/invoices/{invoice_id}")
-def get_invoice(invoice_id: str):
-    doc = db["invoice"].find_one({"_id": PyObjectId.validate(invoice_id)})
+async def get_invoice(invoice_id: str):
+    doc = await db["invoice"].find_one({"_id": PyObjectId.validate(invoice_id)})
     if not doc:
         raise HTTPException(status_code=404, detail="Invoice not found")
     return to_str_id(doc)
 
 
+@app.get("/api/invoices/{invoice_id}/html")
+async def get_invoice_html(invoice_id: str):
+    # Lazy render: serve the stored HTML if the background task has run,
+    # otherwise render on demand from the structured fields.
+    if (cached := await cache_get(f"invoice:html:{invoice_id}")) is not None:
+        return HTMLResponse(cached)
+    doc = await db["invoice"].find_one({"_id": PyObjectId.validate(invoice_id)})
+    if not doc:
+        raise HTTPException(status_code=404, detail="Invoice not found")
+    html = doc.get("html") or render_invoice_html(doc)
+    await cache_set(f"invoice:html:{invoice_id}", html, INVOICE_HTML_CACHE_TTL)
+    return HTMLResponse(html)
+
+
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=port,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WORKERS", os.cpu_count() or 1)),
+    )